@@ -5,22 +5,103 @@ Runs on Render to collect data every 15 minutes
 """
 
 import os
+import io
 import atexit
-from datetime import datetime
-from flask import Flask, jsonify
+import threading
+import weakref
+from datetime import datetime, timezone
+from flask import Flask, Response, jsonify
+from flask.json.provider import JSONProvider
 from apscheduler.schedulers.background import BackgroundScheduler
 import psycopg2
+import psycopg2.extras
+import psycopg2.pool
+import orjson
 import requests
 from pyhtcc import PyHTCC
+import htcc_session
+from htcc_session import MODE_MAP, FAN_MAP, lookup_code
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (C extension) instead of stdlib json"""
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 
 # Render URL for self-ping (set this after deployment)
 RENDER_URL = os.environ.get('RENDER_EXTERNAL_URL')
 
+# Reused for every self-ping so the TCP/TLS connection to Render stays open
+SESSION = requests.Session()
+SESSION.headers.update({'User-Agent': 'keepalive/1.0'})
+SESSION.mount('https://', requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=1))
+
 # Database connection
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Keep a warm connection between collections instead of reconnecting to Neon
+# (TCP + TLS + auth) for every single-row insert. minconn=0 defers the first
+# connect to the first collection, so an unreachable database fails that
+# collection instead of the module import.
+POOL = psycopg2.pool.ThreadedConnectionPool(
+    minconn=0, maxconn=4, dsn=DATABASE_URL, keepalives=1, keepalives_idle=60
+)
+
+# Column order shared by every thermostat_readings insert path. recorded_at is
+# stamped at collection time so readings written late keep their real time,
+# and so the inserts only need to return the new id.
+READING_COLUMNS = (
+    'recorded_at', 'indoor_temp', 'outdoor_temp', 'adjusted_outdoor_temp', 'heat_setpoint', 'cool_setpoint',
+    'humidity', 'mode', 'fan_mode', 'is_heating', 'is_cooling',
+)
+
+# Server-side prepared INSERT, created once per pooled connection so each
+# collection skips the Parse/plan step. Requires a direct (non -pooler) Neon
+# endpoint: PgBouncer in transaction mode does not keep SQL-level PREPAREs.
+PREPARE_INSERT_SQL = """
+    PREPARE ins_reading AS
+    INSERT INTO thermostat_readings
+    (recorded_at, indoor_temp, outdoor_temp, adjusted_outdoor_temp, heat_setpoint, cool_setpoint,
+     humidity, mode, fan_mode, is_heating, is_cooling)
+    VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11)
+    RETURNING id
+"""
+EXECUTE_INSERT_SQL = "EXECUTE ins_reading (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)"
+
+# Multi-row INSERT used when several readings are queued at once
+BATCH_INSERT_SQL = """
+    INSERT INTO thermostat_readings
+    (recorded_at, indoor_temp, outdoor_temp, adjusted_outdoor_temp, heat_setpoint, cool_setpoint,
+     humidity, mode, fan_mode, is_heating, is_cooling)
+    VALUES %s
+    RETURNING id
+"""
+
+# Bulk backfill path (see bulk_load)
+COPY_READINGS_SQL = """
+    COPY thermostat_readings
+    (recorded_at, indoor_temp, outdoor_temp, adjusted_outdoor_temp, heat_setpoint, cool_setpoint,
+     humidity, mode, fan_mode, is_heating, is_cooling)
+    FROM STDIN WITH (FORMAT text)
+"""
+
+# Pooled connections that already have ins_reading prepared
+_prepared_conns = weakref.WeakSet()
+
+# Readings waiting to be written. A write that fails because the database
+# is unreachable leaves them queued so the next collection retries them
+# together with its own reading.
+PENDING = []
+PENDING_LOCK = threading.Lock()
+
 # Honeywell credentials
 HONEYWELL_EMAIL = os.environ.get('PYHTCC_EMAIL')
 HONEYWELL_PASS = os.environ.get('PYHTCC_PASS')
@@ -29,6 +110,20 @@ HONEYWELL_PASS = os.environ.get('PYHTCC_PASS')
 DOWNSTAIRS_SETPOINT = 65
 HEAT_RISE_FACTOR = 0.3
 
+# Cached Honeywell client and zone, so polls reuse the logged-in session
+# instead of repeating the portal login every 15 minutes. The scheduler and
+# /collect request threads share them, so all access holds HTCC_LOCK
+# (a requests.Session is not safe to use from several threads at once).
+_htcc = None
+_zone = None
+HTCC_LOCK = threading.Lock()
+
+# Honeywell session cookies saved across restarts, so the first collection
+# after a Render cold start can skip the portal login. Kept beside the app
+# rather than in world-writable /tmp, where another user could plant it.
+HTCC_COOKIE_PATH = os.environ.get(
+    'HTCC_COOKIE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.htcc.cookies'))
+
 # Track last collection status
 last_collection = {
     'time': None,
@@ -38,88 +133,209 @@ last_collection = {
 }
 
 
-def get_thermostat_data():
-    """Fetch current thermostat data from Honeywell"""
+def get_zone():
+    """
+    Return the thermostat zone with fresh zone info, logging in only when needed
+    Callers must hold HTCC_LOCK
+    """
+    global _htcc, _zone
+
+    if _zone is not None:
+        try:
+            _zone.refresh_zone_info()
+            htcc_session.save_session(_htcc, HTCC_COOKIE_PATH)
+            return _zone
+        except Exception as e:
+            # Session expired or was rejected - fall through to a fresh login
+            print(f"  Honeywell session invalid ({e}), logging in again")
+            _htcc = _zone = None
+    else:
+        # Cold start: try the session saved by the previous process first
+        htcc = htcc_session.load_session(HTCC_COOKIE_PATH, HONEYWELL_EMAIL, HONEYWELL_PASS)
+        if htcc is not None:
+            try:
+                zones = htcc.get_all_zones()
+            except Exception as e:
+                print(f"  Saved Honeywell session rejected ({e}), logging in again")
+                zones = []
+            if zones:
+                _htcc, _zone = htcc, zones[0]
+                htcc_session.save_session(htcc, HTCC_COOKIE_PATH)
+                return _zone
+
     htcc = PyHTCC(HONEYWELL_EMAIL, HONEYWELL_PASS)
     zones = htcc.get_all_zones()
 
     if not zones:
         raise Exception("No zones found")
 
-    zone = zones[0]
-    info = zone.zone_info
+    _htcc, _zone = htcc, zones[0]
+    htcc_session.save_session(htcc, HTCC_COOKIE_PATH)
+    return _zone
+
+
+def get_thermostat_data():
+    """Fetch current thermostat data from Honeywell"""
+    # refresh_zone_info() swaps in a new dict, so info stays consistent
+    # after the lock is released
+    with HTCC_LOCK:
+        info = get_zone().zone_info
     ui_data = info.get('latestData', {}).get('uiData', {})
     fan_data = info.get('latestData', {}).get('fanData', {})
 
-    mode_map = {0: 'emheat', 1: 'heat', 2: 'off', 3: 'cool', 4: 'auto'}
-    fan_map = {0: 'auto', 1: 'on', 2: 'circulate'}
-
     equip_status = ui_data.get('EquipmentOutputStatus', 0)
     outdoor_temp = info.get('OutdoorTemperature') if info.get('OutdoorTemperature') != 128 else None
 
     adjusted_outdoor = None
     if outdoor_temp is not None:
-        if outdoor_temp < DOWNSTAIRS_SETPOINT:
-            adjusted_outdoor = outdoor_temp + (HEAT_RISE_FACTOR * (DOWNSTAIRS_SETPOINT - outdoor_temp))
-        else:
-            adjusted_outdoor = outdoor_temp
+        adjusted_outdoor = outdoor_temp + HEAT_RISE_FACTOR * max(0, DOWNSTAIRS_SETPOINT - outdoor_temp)
 
     return {
+        'recorded_at': datetime.now(timezone.utc),
         'indoor_temp': info.get('DispTemp'),
         'outdoor_temp': outdoor_temp,
         'adjusted_outdoor_temp': adjusted_outdoor,
         'heat_setpoint': ui_data.get('HeatSetpoint'),
         'cool_setpoint': ui_data.get('CoolSetpoint'),
         'humidity': info.get('IndoorHumi'),
-        'mode': mode_map.get(ui_data.get('SystemSwitchPosition'), 'unknown'),
-        'fan_mode': fan_map.get(fan_data.get('fanMode'), 'unknown'),
+        'mode': lookup_code(MODE_MAP, ui_data.get('SystemSwitchPosition')),
+        'fan_mode': lookup_code(FAN_MAP, fan_data.get('fanMode')),
         'is_heating': equip_status == 1,
         'is_cooling': equip_status == 2,
     }
 
 
-def save_to_db(data):
-    """Save thermostat reading to Neon database"""
-    conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
-
-    cur.execute("""
-        INSERT INTO thermostat_readings
-        (indoor_temp, outdoor_temp, adjusted_outdoor_temp, heat_setpoint, cool_setpoint,
-         humidity, mode, fan_mode, is_heating, is_cooling)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-        RETURNING id, recorded_at
-    """, (
-        data['indoor_temp'],
-        data['outdoor_temp'],
-        data['adjusted_outdoor_temp'],
-        data['heat_setpoint'],
-        data['cool_setpoint'],
-        data['humidity'],
-        data['mode'],
-        data['fan_mode'],
-        data['is_heating'],
-        data['is_cooling'],
-    ))
-
-    result = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
-
-    return result
+def get_db_connection():
+    """Check out a pooled connection in autocommit mode"""
+    conn = POOL.getconn()
+    # Every write here is a single statement, so autocommit avoids the
+    # separate BEGIN and COMMIT round trips psycopg2 would otherwise add
+    conn.autocommit = True
+    return conn
+
+
+def save_to_db(rows):
+    """Save thermostat reading rows to Neon database in a single round trip"""
+    # Neon suspends idle computes, so a pooled connection may be dead by the
+    # next collection - discard it and retry once on a fresh one
+    for attempt in range(2):
+        conn = get_db_connection()
+        discard = False
+        try:
+            with conn.cursor() as cur:
+                if len(rows) == 1:
+                    if conn not in _prepared_conns:
+                        cur.execute(PREPARE_INSERT_SQL)
+                        _prepared_conns.add(conn)
+                    cur.execute(EXECUTE_INSERT_SQL, rows[0])
+                    result = cur.fetchall()
+                else:
+                    # One page keeps the whole batch in a single (atomic) statement
+                    result = psycopg2.extras.execute_values(
+                        cur, BATCH_INSERT_SQL, rows, page_size=len(rows), fetch=True
+                    )
+            return result
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            if attempt:
+                raise
+        finally:
+            POOL.putconn(conn, close=discard)
+
+
+def _copy_field(value):
+    """Format one value for COPY ... FORMAT text"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return 't' if value else 'f'
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return (str(value).replace('\\', '\\\\').replace('\t', '\\t')
+            .replace('\n', '\\n').replace('\r', '\\r'))
+
+
+def bulk_load(rows):
+    """
+    Backfill thermostat_readings with a single COPY instead of INSERTs
+
+    rows: iterable of reading dicts keyed by READING_COLUMNS (recorded_at
+    included), e.g. parsed from a Honeywell export.
+    Returns: number of rows loaded
+    """
+    buf = io.StringIO()
+    count = 0
+    for row in rows:
+        buf.write('\t'.join(_copy_field(row[col]) for col in READING_COLUMNS) + '\n')
+        count += 1
+    buf.seek(0)
+
+    conn = get_db_connection()
+    discard = False
+    try:
+        with conn.cursor() as cur:
+            cur.copy_expert(COPY_READINGS_SQL, buf)
+    except (psycopg2.OperationalError, psycopg2.InterfaceError):
+        # Don't hand a dead connection back to the pool (see save_to_db)
+        discard = True
+        raise
+    finally:
+        POOL.putconn(conn, close=discard)
+
+    return count
+
+
+def queue_reading(data):
+    """Queue a thermostat reading for the next flush"""
+    with PENDING_LOCK:
+        PENDING.append(tuple(data[col] for col in READING_COLUMNS))
+
+
+def flush_pending():
+    """Write all queued readings at once, keeping them queued if the database is unreachable"""
+    with PENDING_LOCK:
+        if not PENDING:
+            return []
+        try:
+            result = save_to_db(PENDING)
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            raise
+        except Exception:
+            # The batch is one atomic statement, so a row the database rejects
+            # would fail every later flush too - drop the batch instead
+            print(f"  Dropping {len(PENDING)} reading(s) rejected by the database")
+            PENDING.clear()
+            raise
+        PENDING.clear()
+        return result
 
 
 def keep_alive():
     """Self-ping to prevent Render free tier from sleeping"""
     if RENDER_URL:
         try:
-            response = requests.get(f"{RENDER_URL}/", timeout=10)
+            response = SESSION.get(f"{RENDER_URL}/", timeout=10)
             print(f"[{datetime.now()}] Keep-alive ping: {response.status_code}")
         except Exception as e:
             print(f"[{datetime.now()}] Keep-alive error: {e}")
 
 
+def refresh_status_blobs():
+    """Re-serialize the / and /status bodies after last_collection changes"""
+    global index_blob, status_blob
+    index_blob = orjson.dumps({
+        'status': 'running',
+        'service': 'Thermostat Data Collector',
+        'last_collection': last_collection
+    })
+    status_blob = orjson.dumps(last_collection)
+
+
+# / and /status are polled far more often than last_collection changes, so
+# serve them from bytes serialized once per collection
+refresh_status_blobs()
+
+
 def collect_data():
     """Background job to collect thermostat data"""
     global last_collection
@@ -127,7 +343,10 @@ def collect_data():
 
     try:
         data = get_thermostat_data()
-        record_id, recorded_at = save_to_db(data)
+        queue_reading(data)
+        saved = flush_pending()
+        # Empty if a concurrent /collect already flushed this reading
+        record_id = saved[-1][0] if saved else None
 
         last_collection = {
             'time': datetime.now().isoformat(),
@@ -140,6 +359,8 @@ def collect_data():
                 'is_heating': data['is_heating']
             }
         }
+        if len(saved) > 1:
+            print(f"  Flushed {len(saved) - 1} queued reading(s)")
         print(f"  Saved record #{record_id}: Indoor={data['indoor_temp']}F, Outdoor={data['outdoor_temp']}F, Heating={data['is_heating']}")
 
     except Exception as e:
@@ -147,13 +368,21 @@ def collect_data():
             'time': datetime.now().isoformat(),
             'status': 'error',
             'error': str(e),
-            'data': None
+            'data': None,
+            'pending': len(PENDING)
         }
-        print(f"  Error: {e}")
+        print(f"  Error: {e} ({len(PENDING)} reading(s) queued for retry)")
 
+    refresh_status_blobs()
 
-# Set up scheduler
-scheduler = BackgroundScheduler()
+
+# Set up scheduler. An overrunning job never gets a second concurrent
+# instance, and runs missed during an outage collapse into a single catch-up.
+scheduler = BackgroundScheduler(job_defaults={
+    'max_instances': 1,
+    'coalesce': True,
+    'misfire_grace_time': 60,
+})
 scheduler.add_job(func=collect_data, trigger="interval", minutes=15, id="collect")
 scheduler.add_job(func=keep_alive, trigger="interval", minutes=10, id="keepalive")
 scheduler.start()
@@ -161,18 +390,15 @@ scheduler.start()
 # Run initial collection on startup
 collect_data()
 
-# Shut down scheduler when app exits
+# Shut down scheduler and close pooled connections when app exits
 atexit.register(lambda: scheduler.shutdown())
+atexit.register(POOL.closeall)
 
 
 @app.route('/')
 def index():
     """Health check endpoint"""
-    return jsonify({
-        'status': 'running',
-        'service': 'Thermostat Data Collector',
-        'last_collection': last_collection
-    })
+    return Response(index_blob, mimetype='application/json')
 
 
 @app.route('/collect')
@@ -188,7 +414,7 @@ def manual_collect():
 @app.route('/status')
 def status():
     """Get last collection status"""
-    return jsonify(last_collection)
+    return Response(status_blob, mimetype='application/json')
 
 
 if __name__ == '__main__':
@@ -15,6 +15,10 @@ Sources:
   - Kentucky Tariff November 2025, Sheet No. 4
 """
 
+import functools
+
+import numpy as np
+
 # =============================================================================
 # KENTUCKY G-1 RESIDENTIAL PARAMETERS (from KY PSC Case 2021-00214)
 # =============================================================================
@@ -102,16 +106,32 @@ def calculate_wna_factor_ccf(R_ccf, HSF, BL, NDD, ADD):
     return wnaf
 
 
-def calculate_bill(usage_mcf, NDD, ADD, winter_month=True):
+def calculate_wna_factor_array(R, HSF, BL, NDD, ADD):
     """
-    Calculate distribution portion of bill for Bowling Green, KY G-1 Residential
+    Vectorized WNAF for batch studies (sweeps, backtests, Monte-Carlo)
 
-    usage_mcf: Gas usage in Mcf (as shown on bill)
-    NDD: Normal Heating Degree Days for billing cycle
-    ADD: Actual Heating Degree Days for billing cycle
-    winter_month: True if November-April (WNA applies)
+    NDD and ADD may be scalars or NumPy arrays and are broadcast together.
+    R, HSF and BL must share one basis, as in the scalar functions above:
+    Mcf inputs give $/Mcf, Ccf inputs give $/Ccf.
+    Returns: ndarray of WNAF (0.0 wherever the denominator is 0)
+    """
+    NDD = np.asarray(NDD, dtype=np.float64)
+    ADD = np.asarray(ADD, dtype=np.float64)
 
-    Returns: dict with bill components
+    denominator = BL + (HSF * ADD)
+    zero = denominator == 0
+    wnaf = R * (HSF * (NDD - ADD)) / np.where(zero, 1.0, denominator)
+
+    return np.where(zero, 0.0, wnaf)
+
+
+@functools.lru_cache(maxsize=4096)
+def _compute_bill_numeric(usage_mcf, NDD, ADD, winter_month):
+    """
+    Numeric core of calculate_bill
+
+    Pure, so results are memoized for repeated scenarios.
+    Returns: (base_charge, distribution_volumetric, wnaf, wna_amount, prp_amount, total_distribution)
     """
     params = KY_RESIDENTIAL
 
@@ -147,6 +167,23 @@ def calculate_bill(usage_mcf, NDD, ADD, winter_month=True):
     # Total distribution = base + volumetric + WNA + riders
     total_distribution = base_charge + distribution_volumetric + wna_amount + total_riders
 
+    return base_charge, distribution_volumetric, wnaf, wna_amount, prp_amount, total_distribution
+
+
+def calculate_bill(usage_mcf, NDD, ADD, winter_month=True):
+    """
+    Calculate distribution portion of bill for Bowling Green, KY G-1 Residential
+
+    usage_mcf: Gas usage in Mcf (as shown on bill)
+    NDD: Normal Heating Degree Days for billing cycle
+    ADD: Actual Heating Degree Days for billing cycle
+    winter_month: True if November-April (WNA applies)
+
+    Returns: dict with bill components
+    """
+    (base_charge, distribution_volumetric, wnaf, wna_amount,
+     prp_amount, total_distribution) = _compute_bill_numeric(usage_mcf, NDD, ADD, winter_month)
+
     # Determine weather impact
     if ADD > NDD:
         weather_status = "COLDER than normal"
@@ -4,64 +4,51 @@ Billing period: 11/13/25 - 12/11/25
 Usage: 56 Ccf = 5.6 Mcf
 """
 
-# Weather data from timeanddate.com for Bowling Green, KY
-# Format: (high, low) in Fahrenheit
+import numpy as np
 
-weather_data = {
+# Weather data from timeanddate.com for Bowling Green, KY
+# Stored as parallel date / high / low columns (Fahrenheit)
+DATES = (
+    # November 2025 (13-30)
+    "11/13", "11/14", "11/15", "11/16", "11/17", "11/18", "11/19", "11/20", "11/21",
+    "11/22", "11/23", "11/24", "11/25", "11/26", "11/27", "11/28", "11/29", "11/30",
+    # December 2025 (1-11)
+    "12/01", "12/02", "12/03", "12/04", "12/05", "12/06", "12/07", "12/08", "12/09",
+    "12/10", "12/11",
+)
+HIGHS = np.array([
     # November 2025 (13-30)
-    "11/13": (66, 41),
-    "11/14": (75, 39),
-    "11/15": (77, 60),
-    "11/16": (69, 51),
-    "11/17": (62, 32),
-    "11/18": (71, 51),
-    "11/19": (64, 60),
-    "11/20": (59, 53),
-    "11/21": (69, 57),
-    "11/22": (60, 48),
-    "11/23": (60, 42),
-    "11/24": (62, 46),
-    "11/25": (66, 60),
-    "11/26": (59, 37),
-    "11/27": (44, 30),
-    "11/28": (39, 26),
-    "11/29": (48, 26),
-    "11/30": (46, 28),
+        66,     75,     77,     69,     62,     71,     64,     59,     69,
+        60,     60,     62,     66,     59,     44,     39,     48,     46,
     # December 2025 (1-11)
-    "12/01": (42, 23),
-    "12/02": (33, 26),
-    "12/03": (35, 26),
-    "12/04": (35, 32),
-    "12/05": (35, 33),
-    "12/06": (39, 33),
-    "12/07": (46, 33),
-    "12/08": (41, 30),
-    "12/09": (48, 26),
-    "12/10": (48, 35),
-    "12/11": (39, 26),
-}
+        42,     33,     35,     35,     35,     39,     46,     41,     48,
+        48,     39,
+], dtype=np.int16)
+LOWS = np.array([
+    # November 2025 (13-30)
+        41,     39,     60,     51,     32,     51,     60,     53,     57,
+        48,     42,     46,     60,     37,     30,     26,     26,     28,
+    # December 2025 (1-11)
+        23,     26,     26,     32,     33,     33,     33,     30,     26,
+        35,     26,
+], dtype=np.int16)
 
 print("=" * 70)
 print("HDD CALCULATION: Billing Period 11/13/25 - 12/11/25")
 print("=" * 70)
 
-total_hdd = 0
-daily_details = []
-
-for date, (high, low) in weather_data.items():
-    avg_temp = (high + low) / 2
-    hdd = max(0, 65 - avg_temp)  # HDD = 0 if avg >= 65
-    total_hdd += hdd
-    daily_details.append((date, high, low, avg_temp, hdd))
+avg_temp = (HIGHS.astype(np.float32) + LOWS) * 0.5
+hdd = np.maximum(0.0, 65.0 - avg_temp)  # HDD = 0 if avg >= 65
+total_hdd = float(hdd.sum())
 
 print(f"\n{'Date':<8} {'High':>6} {'Low':>6} {'Avg':>6} {'HDD':>6}")
 print("-" * 40)
-for date, high, low, avg, hdd in daily_details:
-    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {hdd:>6.1f}")
+for date, high, low, avg, day_hdd in zip(DATES, HIGHS, LOWS, avg_temp, hdd):
+    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {day_hdd:>6.1f}")
 
 print("-" * 40)
 print(f"{'TOTAL ADD (Actual HDD):':<26} {total_hdd:>6.1f}")
-print(f"{'Days in billing cycle:':<26} {len(weather_data):>6}")
+print(f"{'Days in billing cycle:':<26} {len(DATES):>6}")
 
 # Now calculate WNA
 print("\n" + "=" * 70)
@@ -89,19 +76,22 @@ print("\n--- Testing different NDD values ---")
 print(f"{'NDD':<8} {'WNAF ($/Mcf)':<14} {'WNA Total':<12} {'Dist Rate':<12}")
 print("-" * 50)
 
-for ndd in [500, 520, 540, 555, 560, 580, 600, 620]:
-    if BL + (HSF * ADD) != 0:
-        wnaf = R * (HSF * (ndd - ADD)) / (BL + (HSF * ADD))
-    else:
-        wnaf = 0
-    wna_total = wnaf * usage_mcf
+# Whole sweep evaluated as one broadcast; pass a wider array (or a meshgrid
+# against usage) for larger what-if studies
+ndds = np.array([500, 520, 540, 555, 560, 580, 600, 620], dtype=np.float64)
+if BL + (HSF * ADD) != 0:
+    wnafs = R * (HSF * (ndds - ADD)) / (BL + (HSF * ADD))
+else:
+    wnafs = np.zeros_like(ndds)
+wna_totals = wnafs * usage_mcf
 
-    # Distribution rate = (base distribution + WNA) / usage
-    # Base distribution per Mcf = $1.6261
-    # Effective rate per Ccf = (R + WNAF) / 10
-    effective_rate_ccf = (R + wnaf) / 10
+# Distribution rate = (base distribution + WNA) / usage
+# Base distribution per Mcf = $1.6261
+# Effective rate per Ccf = (R + WNAF) / 10
+effective_rates_ccf = (R + wnafs) / 10.0
 
-    print(f"{ndd:<8} ${wnaf:<13.6f} ${wna_total:<11.2f} ${effective_rate_ccf:.8f}/Ccf")
+for ndd, wnaf, wna_total, effective_rate_ccf in zip(ndds, wnafs, wna_totals, effective_rates_ccf):
+    print(f"{ndd:<8.0f} ${wnaf:<13.6f} ${wna_total:<11.2f} ${effective_rate_ccf:.8f}/Ccf")
 
 # From bill: Distribution Charge = 56 CCF @ $0.16821429/CCF = $9.42
 # Base rate = $0.16261/Ccf
@@ -4,63 +4,51 @@ Billing period: 10/14/25 - 11/12/25
 Usage: 16 Ccf = 1.6 Mcf
 """
 
+import numpy as np
+
 # Weather data from timeanddate.com for Bowling Green, KY
-weather_data = {
+# Stored as parallel date / high / low columns (Fahrenheit)
+DATES = (
+    # October 2025 (14-31)
+    "10/14", "10/15", "10/16", "10/17", "10/18", "10/19", "10/20", "10/21", "10/22",
+    "10/23", "10/24", "10/25", "10/26", "10/27", "10/28", "10/29", "10/30", "10/31",
+    # November 2025 (1-12)
+    "11/01", "11/02", "11/03", "11/04", "11/05", "11/06", "11/07", "11/08", "11/09",
+    "11/10", "11/11", "11/12",
+)
+HIGHS = np.array([
     # October 2025 (14-31)
-    "10/14": (80, 73),
-    "10/15": (80, 75),
-    "10/16": (78, 71),
-    "10/17": (80, 73),
-    "10/18": (87, 80),
-    "10/19": (78, 66),
-    "10/20": (71, 66),
-    "10/21": (71, 66),
-    "10/22": (66, 60),
-    "10/23": (66, 60),
-    "10/24": (62, 57),
-    "10/25": (68, 62),
-    "10/26": (60, 55),
-    "10/27": (57, 53),
-    "10/28": (62, 59),
-    "10/29": (53, 53),
-    "10/30": (57, 51),
-    "10/31": (60, 55),
+        80,     80,     78,     80,     87,     78,     71,     71,     66,
+        66,     62,     68,     60,     57,     62,     53,     57,     60,
     # November 2025 (1-12)
-    "11/01": (60, 42),
-    "11/02": (51, 44),
-    "11/03": (62, 34),
-    "11/04": (69, 39),
-    "11/05": (73, 51),
-    "11/06": (66, 51),
-    "11/07": (69, 59),
-    "11/08": (69, 57),
-    "11/09": (57, 37),
-    "11/10": (35, 28),
-    "11/11": (50, 26),
-    "11/12": (66, 44),
-}
+        60,     51,     62,     69,     73,     66,     69,     69,     57,
+        35,     50,     66,
+], dtype=np.int16)
+LOWS = np.array([
+    # October 2025 (14-31)
+        73,     75,     71,     73,     80,     66,     66,     66,     60,
+        60,     57,     62,     55,     53,     59,     53,     51,     55,
+    # November 2025 (1-12)
+        42,     44,     34,     39,     51,     51,     59,     57,     37,
+        28,     26,     44,
+], dtype=np.int16)
 
 print("=" * 70)
 print("HDD CALCULATION: Billing Period 10/14/25 - 11/12/25")
 print("=" * 70)
 
-total_hdd = 0
-daily_details = []
-
-for date, (high, low) in weather_data.items():
-    avg_temp = (high + low) / 2
-    hdd = max(0, 65 - avg_temp)
-    total_hdd += hdd
-    daily_details.append((date, high, low, avg_temp, hdd))
+avg_temp = (HIGHS.astype(np.float32) + LOWS) * 0.5
+hdd = np.maximum(0.0, 65.0 - avg_temp)
+total_hdd = float(hdd.sum())
 
 print(f"\n{'Date':<8} {'High':>6} {'Low':>6} {'Avg':>6} {'HDD':>6}")
 print("-" * 40)
-for date, high, low, avg, hdd in daily_details:
-    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {hdd:>6.1f}")
+for date, high, low, avg, day_hdd in zip(DATES, HIGHS, LOWS, avg_temp, hdd):
+    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {day_hdd:>6.1f}")
 
 print("-" * 40)
 print(f"{'TOTAL ADD (Actual HDD):':<26} {total_hdd:>6.1f}")
-print(f"{'Days in billing cycle:':<26} {len(weather_data):>6}")
+print(f"{'Days in billing cycle:':<26} {len(DATES):>6}")
 
 # WNA Calculation
 print("\n" + "=" * 70)
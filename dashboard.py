@@ -6,22 +6,69 @@ View: http://localhost:5000
 """
 
 import os
+import time
+import atexit
+import functools
+import threading
+import weakref
 import psycopg2
-from flask import Flask, render_template_string, jsonify
+import psycopg2.pool
+from flask import Flask, Response, render_template_string, url_for
+from flask_compress import Compress
 from dotenv import load_dotenv
 
 load_dotenv()
 
 app = Flask(__name__)
+# The JSON arrays repeat the same keys and timestamp prefixes on every row,
+# so gzip/br shrinks them several-fold on the way to the browser. The
+# vendored Chart.js bundle goes out compressed too; Python reports .js as
+# either JavaScript type depending on version, so both are listed.
+app.config['COMPRESS_MIMETYPES'] = [
+    'application/json', 'text/html', 'application/javascript', 'text/javascript',
+]
+app.config['COMPRESS_LEVEL'] = 6
+Compress(app)
+# Static files are only ever replaced under a new versioned name, so
+# browsers can keep them for a year without revalidating
+app.config['SEND_FILE_MAX_AGE_DEFAULT'] = 365 * 24 * 3600
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
+# Reuse connections across API requests instead of a fresh TCP+TLS+auth
+# handshake to Neon on every dashboard load. minconn=0 connects on the first
+# request, so the dashboard still starts (and can serve errors) without a DB.
+POOL = psycopg2.pool.ThreadedConnectionPool(0, 10, dsn=DATABASE_URL)
+atexit.register(POOL.closeall)
+
+# Chart.js is vendored under static/ (unmodified upstream dist build) so the
+# render path has no cross-origin DNS+TLS setup. The charts plot epoch
+# milliseconds on a linear axis, so no date adapter bundle is needed.
+CHART_SCRIPT = 'vendor/chart-4.5.1.umd.min.js'
+
+# Readings arrive every 15 minutes, so API responses can be shared briefly
+# between dashboard clients and refreshes
+API_CACHE_TTL = 30  # seconds
+
+# Charts get the last SERIES_HOURS downsampled to SERIES_BUCKETS time buckets,
+# so the payload and draw calls stay fixed however many readings there are
+SERIES_HOURS = 24
+SERIES_BUCKETS = 240
+
+# Both API queries read the newest N rows, so index recorded_at DESC and let
+# the planner walk the index instead of sorting the whole table per request
+INDEX_DDL = """
+    CREATE INDEX IF NOT EXISTS ix_thermo_recorded_at_desc
+        ON thermostat_readings (recorded_at DESC);
+    CREATE INDEX IF NOT EXISTS ix_gas_recorded_at_desc
+        ON gas_meter_readings (recorded_at DESC);
+"""
+
 HTML_TEMPLATE = """
 <!DOCTYPE html>
 <html>
 <head>
     <title>Atmos Dashboard</title>
-    <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
-    <script src="https://cdn.jsdelivr.net/npm/chartjs-adapter-date-fns"></script>
+    <script src="{{ chart_script }}"></script>
     <style>
         * { margin: 0; padding: 0; box-sizing: border-box; }
         body {
@@ -160,8 +207,9 @@ HTML_TEMPLATE = """
         }
 
         async function loadData() {
-            const [thermostat, gas] = await Promise.all([
+            const [thermostat, series, gas] = await Promise.all([
                 fetch('/api/thermostat').then(r => r.json()),
+                fetch('/api/thermostat/series').then(r => r.json()),
                 fetch('/api/gas').then(r => r.json())
             ]);
 
@@ -177,16 +225,32 @@ HTML_TEMPLATE = """
                 }
             }
 
+            // Shared time axis: readings are plotted at epoch milliseconds
+            // with hourly ticks labelled in local time
+            const HOUR_MS = 3600 * 1000;
+            const timeAxis = {
+                type: 'linear',
+                ticks: {
+                    color: '#888',
+                    stepSize: HOUR_MS,
+                    callback: v => new Date(v).toLocaleTimeString([], { hour: 'numeric' })
+                },
+                grid: { color: '#333' }
+            };
+            const timeTooltip = {
+                callbacks: { title: items => new Date(items[0].parsed.x).toLocaleString() }
+            };
+            const point = (r, y) => ({ x: Date.parse(r.recorded_at), y: y });
+
             // Temperature chart
             const tempCtx = document.getElementById('tempChart').getContext('2d');
             new Chart(tempCtx, {
                 type: 'line',
                 data: {
-                    labels: thermostat.map(r => new Date(r.recorded_at)).reverse(),
                     datasets: [
                         {
                             label: 'Indoor',
-                            data: thermostat.map(r => parseFloat(r.indoor_temp)).reverse(),
+                            data: series.map(r => point(r, parseFloat(r.indoor_temp))),
                             borderColor: '#00d4ff',
                             backgroundColor: 'rgba(0, 212, 255, 0.1)',
                             fill: true,
@@ -194,7 +258,7 @@ HTML_TEMPLATE = """
                         },
                         {
                             label: 'Outdoor',
-                            data: thermostat.map(r => parseFloat(r.outdoor_temp)).reverse(),
+                            data: series.map(r => point(r, parseFloat(r.outdoor_temp))),
                             borderColor: '#4ecdc4',
                             backgroundColor: 'rgba(78, 205, 196, 0.1)',
                             fill: true,
@@ -202,7 +266,7 @@ HTML_TEMPLATE = """
                         },
                         {
                             label: 'Adjusted',
-                            data: thermostat.map(r => r.adjusted_outdoor_temp ? parseFloat(r.adjusted_outdoor_temp) : null).reverse(),
+                            data: series.map(r => point(r, r.adjusted_outdoor_temp ? parseFloat(r.adjusted_outdoor_temp) : null)),
                             borderColor: '#ffd93d',
                             borderDash: [5, 5],
                             fill: false,
@@ -214,19 +278,15 @@ HTML_TEMPLATE = """
                     responsive: true,
                     maintainAspectRatio: false,
                     scales: {
-                        x: {
-                            type: 'time',
-                            time: { unit: 'hour' },
-                            ticks: { color: '#888' },
-                            grid: { color: '#333' }
-                        },
+                        x: timeAxis,
                         y: {
                             ticks: { color: '#888' },
                             grid: { color: '#333' }
                         }
                     },
                     plugins: {
-                        legend: { labels: { color: '#888' } }
+                        legend: { labels: { color: '#888' } },
+                        tooltip: timeTooltip
                     }
                 }
             });
@@ -236,30 +296,25 @@ HTML_TEMPLATE = """
             new Chart(heatingCtx, {
                 type: 'bar',
                 data: {
-                    labels: thermostat.map(r => new Date(r.recorded_at)).reverse(),
                     datasets: [{
                         label: 'Heating',
-                        data: thermostat.map(r => r.is_heating ? 1 : 0).reverse(),
-                        backgroundColor: thermostat.map(r => r.is_heating ? '#ff6b6b' : '#333').reverse(),
+                        data: series.map(r => point(r, r.is_heating ? 1 : 0)),
+                        backgroundColor: series.map(r => r.is_heating ? '#ff6b6b' : '#333'),
                     }]
                 },
                 options: {
                     responsive: true,
                     maintainAspectRatio: false,
                     scales: {
-                        x: {
-                            type: 'time',
-                            time: { unit: 'hour' },
-                            ticks: { color: '#888' },
-                            grid: { color: '#333' }
-                        },
+                        x: timeAxis,
                         y: {
                             display: false,
                             max: 1
                         }
                     },
                     plugins: {
-                        legend: { display: false }
+                        legend: { display: false },
+                        tooltip: timeTooltip
                     }
                 }
             });
@@ -276,60 +331,165 @@ HTML_TEMPLATE = """
 """
 
 def get_db_connection():
-    return psycopg2.connect(DATABASE_URL)
-
-@app.route('/')
-def dashboard():
-    return render_template_string(HTML_TEMPLATE)
+    conn = POOL.getconn()
+    # Reads only, so skip the implicit BEGIN and the ROLLBACK on return
+    conn.autocommit = True
+    return conn
 
-@app.route('/api/thermostat')
-def api_thermostat():
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT recorded_at, indoor_temp, outdoor_temp, adjusted_outdoor_temp,
+# Both endpoints have Postgres build the JSON array directly; decimals are
+# cast to text to keep the string values the front end already expects.
+# The statements are PREPAREd once per pooled connection so each request
+# skips parse/plan (this needs Neon's direct endpoint, not -pooler).
+PREPARE_SQL = """
+PREPARE thermo_latest(int) AS
+    SELECT coalesce(json_agg(t ORDER BY t.recorded_at DESC), '[]')::text
+    FROM (
+        SELECT recorded_at,
+               indoor_temp::text AS indoor_temp,
+               outdoor_temp::text AS outdoor_temp,
+               adjusted_outdoor_temp::text AS adjusted_outdoor_temp,
                heat_setpoint, humidity, is_heating
         FROM thermostat_readings
         ORDER BY recorded_at DESC
-        LIMIT 100
-    """)
-    columns = ['recorded_at', 'indoor_temp', 'outdoor_temp', 'adjusted_outdoor_temp',
-               'heat_setpoint', 'humidity', 'is_heating']
-    rows = [dict(zip(columns, row)) for row in cur.fetchall()]
-    cur.close()
-    conn.close()
-
-    # Convert datetime and decimal to JSON-serializable
-    for row in rows:
-        row['recorded_at'] = row['recorded_at'].isoformat()
-        row['indoor_temp'] = str(row['indoor_temp'])
-        row['outdoor_temp'] = str(row['outdoor_temp'])
-        row['adjusted_outdoor_temp'] = str(row['adjusted_outdoor_temp']) if row['adjusted_outdoor_temp'] else None
-
-    return jsonify(rows)
+        LIMIT $1
+    ) t;
 
-@app.route('/api/gas')
-def api_gas():
-    conn = get_db_connection()
-    cur = conn.cursor()
-    cur.execute("""
-        SELECT recorded_at, meter_reading, ccf_since_last
+-- M4 downsampling: within each time bucket keep only the first, last,
+-- min and max reading of every charted series. A line drawn through
+-- those rows looks the same as one drawn through all of them.
+PREPARE thermo_series(int, int) AS
+    WITH bucketed AS (
+        SELECT recorded_at, indoor_temp, outdoor_temp,
+               adjusted_outdoor_temp, is_heating,
+               width_bucket(extract(epoch FROM recorded_at),
+                            extract(epoch FROM now() - make_interval(hours => $1)),
+                            extract(epoch FROM now()),
+                            $2) AS bucket
+        FROM thermostat_readings
+        WHERE recorded_at >= now() - make_interval(hours => $1)
+    ), ranked AS (
+        SELECT *,
+               row_number() OVER (PARTITION BY bucket ORDER BY recorded_at) AS first_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY recorded_at DESC) AS last_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY indoor_temp) AS indoor_min_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY indoor_temp DESC NULLS LAST) AS indoor_max_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY outdoor_temp) AS outdoor_min_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY outdoor_temp DESC NULLS LAST) AS outdoor_max_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY adjusted_outdoor_temp) AS adjusted_min_rn,
+               row_number() OVER (PARTITION BY bucket ORDER BY adjusted_outdoor_temp DESC NULLS LAST) AS adjusted_max_rn
+        FROM bucketed
+    )
+    SELECT coalesce(json_agg(t ORDER BY t.recorded_at), '[]')::text
+    FROM (
+        SELECT recorded_at,
+               indoor_temp::text AS indoor_temp,
+               outdoor_temp::text AS outdoor_temp,
+               adjusted_outdoor_temp::text AS adjusted_outdoor_temp,
+               is_heating
+        FROM ranked
+        WHERE 1 IN (first_rn, last_rn, indoor_min_rn, indoor_max_rn,
+                    outdoor_min_rn, outdoor_max_rn,
+                    adjusted_min_rn, adjusted_max_rn)
+    ) t;
+
+PREPARE gas_latest(int) AS
+    SELECT coalesce(json_agg(t ORDER BY t.recorded_at DESC), '[]')::text
+    FROM (
+        SELECT recorded_at, meter_reading,
+               ccf_since_last::text AS ccf_since_last
         FROM gas_meter_readings
         ORDER BY recorded_at DESC
-        LIMIT 20
-    """)
-    columns = ['recorded_at', 'meter_reading', 'ccf_since_last']
-    rows = [dict(zip(columns, row)) for row in cur.fetchall()]
-    cur.close()
-    conn.close()
+        LIMIT $1
+    ) t;
+"""
+
+# Pooled connections that already have PREPARE_SQL applied
+_prepared_conns = weakref.WeakSet()
+
+def fetch_all(query, params=None):
+    """Run a read query on a pooled connection"""
+    # Neon suspends idle computes, so a pooled connection may be dead after
+    # the dashboard sits idle - discard it and retry once on a fresh one
+    for attempt in range(2):
+        conn = get_db_connection()
+        discard = False
+        try:
+            with conn.cursor() as cur:
+                if conn not in _prepared_conns:
+                    cur.execute(PREPARE_SQL)
+                    _prepared_conns.add(conn)
+                cur.execute(query, params)
+                return cur.fetchall()
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            discard = True
+            if attempt:
+                raise
+        finally:
+            POOL.putconn(conn, close=discard)
+
+def ensure_indexes():
+    """Create the recorded_at indexes the API queries rely on, if missing"""
+    # Best effort: without a database the dashboard still starts, and the
+    # API routes return errors until it is reachable
+    try:
+        conn = get_db_connection()
+    except psycopg2.Error as e:
+        print(f"Warning: could not create indexes: {e}")
+        return
+    discard = False
+    try:
+        with conn.cursor() as cur:
+            cur.execute(INDEX_DDL)
+    except psycopg2.Error as e:
+        discard = isinstance(e, (psycopg2.OperationalError, psycopg2.InterfaceError))
+        print(f"Warning: could not create indexes: {e}")
+    finally:
+        POOL.putconn(conn, close=discard)
+
+def cached_json(view):
+    """Serve a view's JSON text, re-running it at most every API_CACHE_TTL seconds"""
+    cache = {'expires': 0.0, 'body': None}
+    lock = threading.Lock()
+
+    @functools.wraps(view)
+    def wrapper():
+        # Held while the view runs so concurrent misses share one query
+        with lock:
+            now = time.monotonic()
+            if now >= cache['expires']:
+                cache['body'] = view().encode()
+                cache['expires'] = now + API_CACHE_TTL
+            body = cache['body']
+        return Response(body, mimetype='application/json')
+
+    return wrapper
 
-    for row in rows:
-        row['recorded_at'] = row['recorded_at'].isoformat()
-        row['ccf_since_last'] = str(row['ccf_since_last']) if row['ccf_since_last'] else None
+def fetch_json(query, params=None):
+    """Run a query that returns a single JSON text value"""
+    return fetch_all(query, params)[0][0]
 
-    return jsonify(rows)
+@app.route('/')
+def dashboard():
+    return render_template_string(HTML_TEMPLATE,
+                                  chart_script=url_for('static', filename=CHART_SCRIPT))
+
+@app.route('/api/thermostat')
+@cached_json
+def api_thermostat():
+    return fetch_json("EXECUTE thermo_latest (%s)", (20,))
+
+@app.route('/api/thermostat/series')
+@cached_json
+def api_thermostat_series():
+    return fetch_json("EXECUTE thermo_series (%s, %s)", (SERIES_HOURS, SERIES_BUCKETS))
+
+@app.route('/api/gas')
+@cached_json
+def api_gas():
+    return fetch_json("EXECUTE gas_latest (%s)", (20,))
 
 if __name__ == '__main__':
     print("Starting Atmos Dashboard...")
+    ensure_indexes()
     print("View at: http://localhost:5000")
     app.run(debug=True, port=5000)
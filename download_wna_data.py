@@ -1,16 +1,13 @@
-import subprocess
-import sys
-
-# Install required libraries
-try:
-    import requests
-    import openpyxl
-except ImportError:
-    subprocess.check_call([sys.executable, "-m", "pip", "install", "requests", "openpyxl"])
-    import requests
-    import openpyxl
+"""
+Download and inspect the KY PSC WNA workbooks (Case 2021-00214)
+Requires: requests, openpyxl (pip install -r requirements.txt)
+"""
 
+import requests
+import openpyxl
 import os
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 # URLs for KY PSC Case 2021-00214 WNA documents
 urls = {
@@ -24,21 +21,34 @@ print("=" * 70)
 print("Downloading KY PSC WNA Data Files")
 print("=" * 70)
 
-for name, url in urls.items():
+def download(name, url):
+    """Fetch one workbook to output_dir, returning (filename, size)"""
     filename = os.path.join(output_dir, f"{name}.xlsx")
-    print(f"\nDownloading: {name}")
-    print(f"  URL: {url[:80]}...")
-
-    try:
-        response = requests.get(url, timeout=30)
+    # Stream straight to disk rather than buffering the whole workbook. Each
+    # call runs on its own worker thread, so it gets its own Session.
+    with requests.Session() as session, session.get(url, stream=True, timeout=30) as response:
         response.raise_for_status()
+        response.raw.decode_content = True
 
         with open(filename, "wb") as f:
-            f.write(response.content)
-        print(f"  Saved to: {filename}")
-        print(f"  Size: {len(response.content):,} bytes")
-    except Exception as e:
-        print(f"  ERROR: {e}")
+            shutil.copyfileobj(response.raw, f, length=1 << 16)
+    return filename, os.path.getsize(filename)
+
+# Both files come from the same slow PSC host, so fetch them concurrently
+with ThreadPoolExecutor(max_workers=len(urls)) as executor:
+    futures = {executor.submit(download, name, url): (name, url) for name, url in urls.items()}
+
+    for future in as_completed(futures):
+        name, url = futures[future]
+        print(f"\nDownloading: {name}")
+        print(f"  URL: {url[:80]}...")
+
+        try:
+            filename, size = future.result()
+            print(f"  Saved to: {filename}")
+            print(f"  Size: {size:,} bytes")
+        except Exception as e:
+            print(f"  ERROR: {e}")
 
 print("\n" + "=" * 70)
 print("Extracting WNA Parameters")
@@ -46,9 +56,11 @@ print("=" * 70)
 
 # Read Residential WNA Customer file
 wna_file = os.path.join(output_dir, "Residential_WNA_Customer.xlsx")
+# read_only streams the sheet XML instead of building the full cell graph,
+# which is all the first-30-rows preview below needs
 if os.path.exists(wna_file):
     print(f"\nReading: {wna_file}")
-    wb = openpyxl.load_workbook(wna_file)
+    wb = openpyxl.load_workbook(wna_file, read_only=True, data_only=True)
 
     for sheet_name in wb.sheetnames:
         print(f"\n--- Sheet: {sheet_name} ---")
@@ -61,11 +73,13 @@ if os.path.exists(wna_file):
                 row_str = " | ".join(str(cell)[:30] if cell else "" for cell in row[:10])
                 print(f"  Row {row_num}: {row_str}")
 
+    wb.close()
+
 # Read Bill Cycle Normals file
 normals_file = os.path.join(output_dir, "Bill_Cycle_Normals.xlsx")
 if os.path.exists(normals_file):
     print(f"\n\nReading: {normals_file}")
-    wb = openpyxl.load_workbook(normals_file)
+    wb = openpyxl.load_workbook(normals_file, read_only=True, data_only=True)
 
     for sheet_name in wb.sheetnames:
         print(f"\n--- Sheet: {sheet_name} ---")
@@ -77,5 +91,7 @@ if os.path.exists(normals_file):
                 row_str = " | ".join(str(cell)[:25] if cell else "" for cell in row[:12])
                 print(f"  Row {row_num}: {row_str}")
 
+    wb.close()
+
 print("\n" + "=" * 70)
 print("Done!")
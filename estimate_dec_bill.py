@@ -3,98 +3,74 @@ Estimate HDD and WNA for December 2025 bill
 Billing period: 12/12/25 - 1/13/26
 """
 
-# Actual weather data (12/12 - 1/6)
-weather_actual = {
-    # December 2025
-    "12/12": (48, 34),
-    "12/13": (41, 30),
-    "12/14": (26, 14),
-    "12/15": (37, 10),
-    "12/16": (48, 34),
-    "12/17": (55, 48),
-    "12/18": (61, 43),
-    "12/19": (46, 34),
-    "12/20": (61, 26),
-    "12/21": (52, 28),
-    "12/22": (61, 26),
-    "12/23": (66, 57),
-    "12/24": (70, 61),
-    "12/25": (68, 61),
-    "12/26": (68, 60),
-    "12/27": (70, 59),
-    "12/28": (75, 48),
-    "12/29": (46, 30),
-    "12/30": (36, 25),
-    "12/31": (48, 32),
-    # January 2026 (actual through 1/6)
-    "01/01": (55, 28),
-    "01/02": (43, 33),
-    "01/03": (48, 35),
-    "01/04": (48, 25),
-    "01/05": (63, 27),
-    "01/06": (66, 48),
-}
+import numpy as np
+
+# Weather for the days observed so far (12/12 - 1/8), stored as parallel
+# date / high / low columns (Fahrenheit)
+DATES = np.arange("2025-12-12", "2026-01-09", dtype="datetime64[D]")
+HIGHS = np.array([
+    # December 2025 (12-31)
+        48,     41,     26,     37,     48,     55,     61,     46,     61,     52,
+        61,     66,     70,     68,     68,     70,     75,     46,     36,     48,
+    # January 2026 (actual through 1/6, then 1/7-1/8 estimated)
+        55,     43,     48,     48,     63,     66,     55,     50,
+], dtype=np.int16)
+LOWS = np.array([
+    # December 2025 (12-31)
+        34,     30,     14,     10,     34,     48,     43,     34,     26,     28,
+        26,     57,     61,     61,     60,     59,     48,     30,     25,     32,
+    # January 2026 (actual through 1/6, then 1/7-1/8 estimated)
+        28,     33,     35,     25,     27,     48,     35,     30,
+], dtype=np.int16)
 
 # Estimate for 1/7-1/8 (recent days - assume similar to recent pattern)
-weather_estimated = {
-    "01/07": (55, 35),  # Estimate
-    "01/08": (50, 30),  # Estimate
-}
+ESTIMATED = DATES >= np.datetime64("2026-01-07")
 
 # Future days 1/9-1/13: assume NDD = ADD (normal weather)
 # These contribute 0 to the WNA calculation
 # But we still need to count them for total cycle HDD
 # Use ~25 HDD/day for mid-January normal
-future_days = {
-    "01/09": "normal",
-    "01/10": "normal",
-    "01/11": "normal",
-    "01/12": "normal",
-    "01/13": "normal",
-}
+FUTURE_DATES = np.arange("2026-01-09", "2026-01-14", dtype="datetime64[D]")
 
 print("=" * 70)
 print("HDD ESTIMATE: Billing Period 12/12/25 - 1/13/26")
 print("=" * 70)
 
-# Calculate actual HDD
-actual_hdd = 0
+# Calculate actual HDD over the actual and estimated days
+# int16 temps widen to float32, not float64: half-degree averages are exact
+# and HDD only needs one decimal place
+avg_temp = (HIGHS.astype(np.float32) + LOWS) * 0.5
+hdd = np.maximum(0.0, 65.0 - avg_temp)
+actual_hdd = float(hdd.sum())
+
 print(f"\n{'Date':<8} {'High':>6} {'Low':>6} {'Avg':>6} {'HDD':>6} {'Type':<10}")
 print("-" * 50)
 
-for date, (high, low) in weather_actual.items():
-    avg = (high + low) / 2
-    hdd = max(0, 65 - avg)
-    actual_hdd += hdd
-    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {hdd:>6.1f} {'Actual':<10}")
-
-for date, (high, low) in weather_estimated.items():
-    avg = (high + low) / 2
-    hdd = max(0, 65 - avg)
-    actual_hdd += hdd
-    print(f"{date:<8} {high:>6} {low:>6} {avg:>6.1f} {hdd:>6.1f} {'Estimated':<10}")
+for date, high, low, avg, day_hdd, estimated in zip(DATES.astype(object), HIGHS, LOWS, avg_temp, hdd, ESTIMATED):
+    kind = "Estimated" if estimated else "Actual"
+    print(f"{date.strftime('%m/%d'):<8} {high:>6} {low:>6} {avg:>6.1f} {day_hdd:>6.1f} {kind:<10}")
 
 # For future days, we assume normal (NDD = ADD for those days)
 # So they don't affect the WNA calculation
 # But for total ADD count, use approximate normal daily HDD
 jan_normal_daily_hdd = 25  # Approximate for mid-January
-future_hdd = len(future_days) * jan_normal_daily_hdd
+future_hdd = len(FUTURE_DATES) * jan_normal_daily_hdd
 
-for date in future_days:
-    print(f"{date:<8} {'--':>6} {'--':>6} {'--':>6} {jan_normal_daily_hdd:>6.1f} {'Normal':<10}")
+for date in FUTURE_DATES.astype(object):
+    print(f"{date.strftime('%m/%d'):<8} {'--':>6} {'--':>6} {'--':>6} {jan_normal_daily_hdd:>6.1f} {'Normal':<10}")
 
 print("-" * 50)
 print(f"Actual/Estimated HDD (12/12-1/8):  {actual_hdd:.1f}")
 print(f"Future days HDD (1/9-1/13):        {future_hdd:.1f} (assumed normal)")
 print(f"Total ADD for cycle:               {actual_hdd + future_hdd:.1f}")
-print(f"Days in billing cycle:             {len(weather_actual) + len(weather_estimated) + len(future_days)}")
+print(f"Days in billing cycle:             {len(DATES) + len(FUTURE_DATES)}")
 
 # Estimate NDD for Dec-Jan cycle
 # Based on Nov-Dec cycle: 587 NDD / 29 days = 20.2 HDD/day
 # Dec-Jan should be colder, estimate ~22-25 HDD/day
 # 33 days × 24 HDD/day = 792 NDD (rough estimate)
 estimated_ndd_daily = 24
-total_days = len(weather_actual) + len(weather_estimated) + len(future_days)
+total_days = len(DATES) + len(FUTURE_DATES)
 estimated_ndd = total_days * estimated_ndd_daily
 
 print(f"\n" + "=" * 70)
@@ -110,7 +86,7 @@ BL = 1.0556
 # WNA is based on: (NDD - ADD) for the actual period
 
 # For actual period (12/12 - 1/8): 28 days
-actual_days = len(weather_actual) + len(weather_estimated)
+actual_days = len(DATES)
 actual_period_ndd = actual_days * estimated_ndd_daily
 
 print(f"\nActual period (12/12 - 1/8): {actual_days} days")
@@ -5,13 +5,30 @@ Fetches weather forecast from NWS for future day estimates
 Uses IEM ASOS data for historical hourly temps (KBWG)
 """
 import os
+import io
+import csv
+import json
+import time
+import atexit
+import numpy as np
 import psycopg2
+import psycopg2.extras
 import requests
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# One session per host so repeat requests (NWS /points then the forecast)
+# reuse the pooled TCP+TLS connection. They are kept separate because the
+# NWS calls run on a background thread while IEM is fetched on the main
+# thread, and requests.Session is not documented as thread-safe.
+IEM_SESSION = requests.Session()
+IEM_SESSION.headers.update({"User-Agent": "GasBillEstimator/1.0"})
+NWS_SESSION = requests.Session()
+NWS_SESSION.headers.update({"User-Agent": "GasBillEstimator/1.0"})
+
 # =============================================================================
 # DATABASE CONNECTION
 # =============================================================================
@@ -20,27 +37,133 @@ DATABASE_URL = os.environ.get("DATABASE_URL")
 if not DATABASE_URL:
     raise ValueError("DATABASE_URL environment variable required")
 
+_conn = None
+
+def get_connection():
+    """Open the Neon connection on first use and reuse it for the rest of the run"""
+    global _conn
+    if _conn is None or _conn.closed:
+        _conn = psycopg2.connect(DATABASE_URL)
+        # Single-statement reads and upserts, so skip the implicit BEGIN
+        _conn.autocommit = True
+        atexit.register(_conn.close)
+    return _conn
+
 def get_meter_readings():
     """Fetch meter readings from Neon database"""
-    conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
+    # Served by the recorded_at DESC index, so this is a single index seek
+    with get_connection().cursor() as cur:
+        cur.execute("""
+            SELECT meter_reading, recorded_at
+            FROM gas_meter_readings
+            ORDER BY recorded_at DESC
+            LIMIT 1
+        """)
+        return cur.fetchone()
+
+
+# HDD for settled past days, so each run only computes days it hasn't seen
+DAILY_HDD_DDL = """
+    CREATE TABLE IF NOT EXISTS daily_hdd (
+        date DATE PRIMARY KEY,
+        source TEXT NOT NULL,
+        hdd REAL NOT NULL,
+        tmin REAL,
+        tmax REAL,
+        n_hours INTEGER
+    )
+"""
+
+def load_daily_hdd(start_date, end_date):
+    """Stored daily HDD rows as {"YYYY-MM-DD": (source, hdd, tmin, tmax, n_hours)}"""
+    with get_connection().cursor() as cur:
+        cur.execute(DAILY_HDD_DDL)
+        cur.execute("""
+            SELECT to_char(date, 'YYYY-MM-DD'), source, hdd, tmin, tmax, n_hours
+            FROM daily_hdd
+            WHERE date BETWEEN %s AND %s
+        """, (start_date, end_date))
+        return {row[0]: row[1:] for row in cur.fetchall()}
+
+def save_daily_hdd(rows):
+    """Upsert (date, source, hdd, tmin, tmax, n_hours) rows into daily_hdd"""
+    with get_connection().cursor() as cur:
+        psycopg2.extras.execute_values(cur, """
+            INSERT INTO daily_hdd (date, source, hdd, tmin, tmax, n_hours)
+            VALUES %s
+            ON CONFLICT (date) DO UPDATE SET
+                source = EXCLUDED.source, hdd = EXCLUDED.hdd, tmin = EXCLUDED.tmin,
+                tmax = EXCLUDED.tmax, n_hours = EXCLUDED.n_hours
+        """, rows)
 
-    # Get latest reading
-    cur.execute("""
-        SELECT meter_reading, recorded_at
-        FROM gas_meter_readings
-        ORDER BY recorded_at DESC
-        LIMIT 1
-    """)
-    latest = cur.fetchone()
 
-    cur.close()
-    conn.close()
+# =============================================================================
+# WEATHER DATA (cached on disk between runs)
+# =============================================================================
+
+IEM_CACHE = ".iem_hourly_cache.json"
+# A day's ASOS observations are final once it has ended and IEM has caught
+# up, so settled days are never fetched again
+IEM_SETTLE_TIME = timedelta(hours=3)
+
+NWS_FORECAST_CACHE = ".nws_forecast_cache.json"
+NWS_FORECAST_MAX_AGE = 3600  # seconds; NWS refreshes its forecast hourly at most
+
+
+def load_json_cache(path):
+    """Read a JSON cache file, returning None if it is missing or unreadable"""
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
 
-    return latest
+def save_json_cache(path, data):
+    with open(path, "w") as f:
+        json.dump(data, f)
 
 
 def get_iem_hourly_temps(start_date, end_date):
+    """
+    Hourly temps per day from start_date up to (not including) end_date,
+    as {"YYYY-MM-DD": float32 array}. Settled days come from IEM_CACHE and
+    only the rest are fetched.
+    """
+    cache = load_json_cache(IEM_CACHE) or {}
+    now = datetime.now()
+
+    days = []
+    current = start_date
+    while current < end_date:
+        days.append(current)
+        current += timedelta(days=1)
+
+    def settled(day):
+        entry = cache.get(day.strftime("%Y-%m-%d"))
+        return entry and entry["fetched"] >= (day + timedelta(days=1) + IEM_SETTLE_TIME).timestamp()
+
+    missing = [day for day in days if not settled(day)]
+    if missing:
+        fetched = fetch_iem_hourly_temps(missing[0], end_date)
+        if fetched is None and not cache:
+            return None
+        if fetched is not None:
+            stamp = now.timestamp()
+            for day in days[days.index(missing[0]):]:
+                date_str = day.strftime("%Y-%m-%d")
+                cache[date_str] = {"fetched": stamp, "temps": fetched.get(date_str, [])}
+            save_json_cache(IEM_CACHE, cache)
+
+    hourly_data = {}
+    for day in days:
+        entry = cache.get(day.strftime("%Y-%m-%d"))
+        if entry and entry["temps"]:
+            hourly_data[day.strftime("%Y-%m-%d")] = np.array(entry["temps"], dtype=np.float32)
+    return hourly_data
+
+
+def fetch_iem_hourly_temps(start_date, end_date):
     """
     Fetch hourly temperature data from Iowa Environmental Mesonet (IEM)
     for Bowling Green airport (KBWG)
@@ -55,22 +178,18 @@ def get_iem_hourly_temps(start_date, end_date):
     )
 
     try:
-        response = requests.get(url, timeout=30)
+        response = IEM_SESSION.get(url, timeout=30)
         response.raise_for_status()
 
-        # Parse CSV data
-        lines = response.text.strip().split('\n')
+        # Parse CSV data: station,valid,tmpf with "M" for missing
+        reader = csv.reader(io.StringIO(response.text))
+        next(reader, None)  # Skip header
         hourly_data = {}  # {date: [temps]}
 
-        for line in lines[1:]:  # Skip header
-            parts = line.split(',')
-            if len(parts) >= 3 and parts[2] != 'M':
-                date_str = parts[1].split()[0]  # "2026-01-09"
-                temp = float(parts[2])
-
-                if date_str not in hourly_data:
-                    hourly_data[date_str] = []
-                hourly_data[date_str].append(temp)
+        for row in reader:
+            if len(row) >= 3 and row[2] != 'M':
+                # valid is "2026-01-09 00:53"
+                hourly_data.setdefault(row[1][:10], []).append(float(row[2]))
 
         return hourly_data
 
@@ -84,41 +203,67 @@ def calculate_hourly_hdd(temps):
     Calculate HDD from hourly temperatures
     Each hour contributes: max(0, 65 - temp) / 24
     """
-    if not temps or len(temps) < 20:  # Need most of the day's readings
+    if len(temps) < 20:  # Need most of the day's readings
         return None
 
-    total_hdd = sum(max(0, 65 - temp) for temp in temps) / len(temps) * 24 / 24
     # Simplified: average the hourly HDDs
-    total_hdd = sum(max(0, 65 - temp) for temp in temps) / len(temps)
-    return total_hdd
+    t = np.asarray(temps, dtype=np.float32)
+    return float(np.maximum(0.0, 65.0 - t).mean())
+
+
+# The /points lookup only maps lat/lon to a forecast grid cell, which is
+# fixed, so it is resolved once and kept; only a 404 from the stored
+# forecast URL (NWS re-gridding) triggers a fresh lookup
+NWS_LOCATION = "36.9685,-86.4808"  # Bowling Green, KY
+NWS_GRIDPOINT_CACHE = "nws_gridpoint.json"
+
+
+def get_nws_gridpoint(location, refresh=False):
+    """NWS grid cell {"forecast_url", "gridId", "gridX", "gridY"} for "lat,lon", cached on disk"""
+    cache = load_json_cache(NWS_GRIDPOINT_CACHE) or {}
+    if location in cache and not refresh:
+        return cache[location]
+
+    response = NWS_SESSION.get(f"https://api.weather.gov/points/{location}", timeout=10)
+    response.raise_for_status()
+    props = response.json()["properties"]
+    cache[location] = {
+        "forecast_url": props["forecast"],
+        "gridId": props["gridId"],
+        "gridX": props["gridX"],
+        "gridY": props["gridY"],
+    }
+    save_json_cache(NWS_GRIDPOINT_CACHE, cache)
+    return cache[location]
 
 
 def get_nws_forecast():
     """Fetch weather forecast from NWS API for Bowling Green, KY"""
-    points_url = "https://api.weather.gov/points/36.9685,-86.4808"
-    headers = {"User-Agent": "GasBillEstimator/1.0"}
-
     try:
-        response = requests.get(points_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        data = response.json()
-        forecast_url = data["properties"]["forecast"]
-
-        response = requests.get(forecast_url, headers=headers, timeout=10)
-        response.raise_for_status()
-        forecast_data = response.json()
+        cached = load_json_cache(NWS_FORECAST_CACHE)
+        if cached and time.time() - cached["fetched"] < NWS_FORECAST_MAX_AGE:
+            periods = cached["periods"]
+        else:
+            gridpoint = get_nws_gridpoint(NWS_LOCATION)
+            response = NWS_SESSION.get(gridpoint["forecast_url"], timeout=10)
+            if response.status_code == 404:
+                gridpoint = get_nws_gridpoint(NWS_LOCATION, refresh=True)
+                response = NWS_SESSION.get(gridpoint["forecast_url"], timeout=10)
+            response.raise_for_status()
+            periods = response.json()["properties"]["periods"]
+            save_json_cache(NWS_FORECAST_CACHE, {"fetched": time.time(), "periods": periods})
 
-        periods = forecast_data["properties"]["periods"]
         daily_forecasts = {}
 
         for period in periods:
             temp = period["temperature"]
             is_day = period["isDaytime"]
-            start_time = datetime.fromisoformat(period["startTime"].replace("Z", "+00:00"))
-            date_key = start_time.strftime("%Y-%m-%d")
+            # startTime is ISO 8601 in local time ("2026-01-09T06:00:00-06:00"),
+            # so its first 10 chars are already the local date key
+            date_key = period["startTime"][:10]
 
             if date_key not in daily_forecasts:
-                daily_forecasts[date_key] = {"high": None, "low": None, "date": start_time}
+                daily_forecasts[date_key] = {"high": None, "low": None}
 
             if is_day:
                 daily_forecasts[date_key]["high"] = temp
@@ -143,7 +288,7 @@ def calculate_future_hdd(forecast_data, start_date, end_date):
     current = start_date
 
     while current <= end_date:
-        date_key = current.strftime("%m/%d")
+        date_key = current.strftime("%Y-%m-%d")  # get_nws_forecast's key format
         if date_key in forecast_data:
             fc = forecast_data[date_key]
             if fc["high"] and fc["low"]:
@@ -160,10 +305,66 @@ def calculate_future_hdd(forecast_data, start_date, end_date):
 
     return future_days
 
+
+# Charges (from actual bills)
+CUSTOMER_CHARGE = 25.00
+PRP_RATE = 0.8214        # $/Mcf
+GAS_RATE = 0.54034       # $/Ccf (GCA)
+SCHOOL_RATE = 0.03       # $/Ccf
+FRANCHISE_RATE = 0.01    # $/Ccf
+PER_CCF_VARIABLE = GAS_RATE + SCHOOL_RATE + FRANCHISE_RATE
+
+
+def print_bill_estimate(usage_ccf, R, wnaf):
+    """Print the itemized bill for usage_ccf at rate R and WNA factor wnaf, returning the total"""
+    print("\n" + "=" * 70)
+    print("BILL ESTIMATE")
+    print("=" * 70)
+
+    usage_mcf = usage_ccf / 10
+
+    # (label, rate, billed quantity) for each usage-based line on the bill
+    charges = {label: rate * qty for label, rate, qty in (
+        ("Distribution", R, usage_mcf),
+        ("WNA", wnaf, usage_mcf),
+        ("PRP", PRP_RATE, usage_mcf),
+        ("Gas Cost (GCA)", GAS_RATE, usage_ccf),
+        ("School Fee", SCHOOL_RATE, usage_ccf),
+        ("Franchise Fee", FRANCHISE_RATE, usage_ccf),
+    )}
+
+    print(f"\nUsage: {usage_ccf:.0f} CCF ({usage_mcf:.1f} Mcf)")
+    print(f"\n{'Charge':<25} {'Amount':>10}")
+    print("-" * 40)
+    print(f"{'Customer Charge':<25} ${CUSTOMER_CHARGE:>9.2f}")
+    for label, amount in charges.items():
+        print(f"{label:<25} ${amount:>9.2f}")
+    print("-" * 40)
+
+    # Rates folded per unit: one Ccf term and one Mcf term
+    total_bill = (CUSTOMER_CHARGE + usage_ccf * PER_CCF_VARIABLE +
+                  usage_mcf * (R + wnaf + PRP_RATE))
+    print(f"{'TOTAL ESTIMATED BILL':<25} ${total_bill:>9.2f}")
+
+    # Show effective rates
+    print(f"\n{'='*40}")
+    print("EFFECTIVE RATES:")
+    dist_total = charges["Distribution"] + charges["WNA"]
+    print(f"  Distribution (w/WNA): ${dist_total/usage_ccf:.5f}/Ccf")
+    print(f"  Total variable:       ${(total_bill - CUSTOMER_CHARGE)/usage_ccf:.5f}/Ccf")
+
+    return total_bill
+
+
 # =============================================================================
 # ACTUAL DATA
 # =============================================================================
 
+# The NWS forecast doesn't depend on anything below, so fetch it in the
+# background while the database and IEM lookups run
+fetch_executor = ThreadPoolExecutor(max_workers=1)
+forecast_future = fetch_executor.submit(get_nws_forecast)
+
 # Meter readings
 meter_dec_11 = 1339  # Bill cycle start reference (from bill)
 
@@ -202,13 +403,29 @@ print("\n" + "=" * 60)
 print("HDD CALCULATION (Hybrid: IEM hourly + NWS forecast)")
 print("=" * 60)
 
-# Fetch historical hourly data from IEM
+# Days before yesterday are settled; their stored HDD is reused as-is
+settled_before = today - timedelta(days=1)
+try:
+    stored_hdd = load_daily_hdd(billing_start_date, settled_before - timedelta(days=1))
+except Exception as e:
+    print(f"[Database] Could not load daily HDD: {e}")
+    stored_hdd = {}
+new_hdd_rows = []
+
+# Fetch historical hourly data from IEM, only from the first day not stored
+fetch_start = billing_start_date
+while fetch_start < settled_before and fetch_start.strftime("%Y-%m-%d") in stored_hdd:
+    fetch_start += timedelta(days=1)
 print("\nFetching IEM hourly data (KBWG)...")
-hourly_data = get_iem_hourly_temps(billing_start_date, today)
+hourly_data = get_iem_hourly_temps(fetch_start, today)
 
-# Fetch NWS forecast for future days
+# Fetch NWS forecast for future days (started above)
 print("Fetching NWS forecast...")
-forecast_data = get_nws_forecast()
+forecast_data = forecast_future.result()
+fetch_executor.shutdown()
+# {"YYYY-MM-DD": (high, low)} for the days with a complete forecast
+forecast_lut = {date: (fc["high"], fc["low"]) for date, fc in (forecast_data or {}).items()
+                if fc["high"] and fc["low"]}
 
 # Calculate HDD for each day
 print(f"\n{'Date':<12} {'Source':<10} {'Temps':<20} {'HDD':>8} {'CCF':>8}")
@@ -216,36 +433,47 @@ print("-" * 62)
 
 total_hdd = 0
 total_ccf = 0
-current_date = billing_start_date
-
-while current_date <= billing_end_date:
-    date_str = current_date.strftime("%Y-%m-%d")
-    date_display = current_date.strftime("%m/%d")
+remaining_hdd = 0  # today onward, still to be metered
+remaining_ccf = 0
 
-    if current_date < today and hourly_data and date_str in hourly_data:
+# Every day of the cycle with its lookup key and display label, built once
+cycle_days = [billing_start_date + timedelta(days=n)
+              for n in range((billing_end_date - billing_start_date).days + 1)]
+cycle = [(day, day.strftime("%Y-%m-%d"), day.strftime("%m/%d"), day < today)
+         for day in cycle_days]
+
+for current_date, date_str, date_display, is_past in cycle:
+    if date_str in stored_hdd:
+        # Settled day already computed on an earlier run
+        source, hdd, tmin, tmax, n_hours = stored_hdd[date_str]
+        detail = f"{n_hours}hr" if source == "IEM" else "partial"
+        temp_info = f"{tmin:.0f}-{tmax:.0f}F ({detail})"
+    elif is_past and hourly_data and date_str in hourly_data:
         # Past day with hourly data - use IEM
-        temps = hourly_data[date_str]
-        if len(temps) >= 20:
+        temps = hourly_data[date_str]  # non-empty float32 array
+        tmin, tmax, n_hours = float(temps.min()), float(temps.max()), temps.size
+        if n_hours >= 20:
             hdd = calculate_hourly_hdd(temps)
-            temp_info = f"{min(temps):.0f}-{max(temps):.0f}F ({len(temps)}hr)"
+            temp_info = f"{tmin:.0f}-{tmax:.0f}F ({n_hours}hr)"
             source = "IEM"
         else:
             # Not enough hourly data, fall back to high/low
-            hdd = max(0, 65 - (max(temps) + min(temps)) / 2) if temps else 0
-            temp_info = f"{min(temps):.0f}-{max(temps):.0f}F (partial)"
+            hdd = max(0, 65 - (tmax + tmin) / 2)
+            temp_info = f"{tmin:.0f}-{tmax:.0f}F (partial)"
             source = "IEM*"
-    elif forecast_data and date_str in forecast_data:
+        if current_date < settled_before:
+            new_hdd_rows.append((date_str, source, float(hdd), tmin, tmax, n_hours))
+    elif date_str in forecast_lut:
         # Future day - use NWS forecast
-        fc = forecast_data[date_str]
-        if fc["high"] and fc["low"]:
-            avg = (fc["high"] + fc["low"]) / 2
-            hdd = max(0, 65 - avg)
-            temp_info = f"{fc['low']}-{fc['high']}F (fcst)"
-            source = "NWS"
-        else:
-            hdd = 25  # Fallback
-            temp_info = "est"
-            source = "Est"
+        high, low = forecast_lut[date_str]
+        hdd = max(0, 65 - (high + low) / 2)
+        temp_info = f"{low}-{high}F (fcst)"
+        source = "NWS"
+    elif forecast_data and date_str in forecast_data:
+        # Forecast without both a high and a low
+        hdd = 25  # Fallback
+        temp_info = "est"
+        source = "Est"
     else:
         # No data - estimate
         hdd = 25
@@ -255,30 +483,21 @@ while current_date <= billing_end_date:
     ccf = hdd * ccf_per_hdd
     total_hdd += hdd
     total_ccf += ccf
+    if not is_past:
+        remaining_hdd += hdd
+        remaining_ccf += ccf
 
     print(f"{date_display:<12} {source:<10} {temp_info:<20} {hdd:>8.1f} {ccf:>8.2f}")
-    current_date += timedelta(days=1)
+
+if new_hdd_rows:
+    try:
+        save_daily_hdd(new_hdd_rows)
+    except Exception as e:
+        print(f"[Database] Could not save daily HDD: {e}")
 
 print("-" * 62)
 print(f"{'TOTAL':<12} {'':<10} {'':<20} {total_hdd:>8.1f} {total_ccf:>8.2f}")
 
-# Calculate remaining CCF (future days only)
-remaining_hdd = 0
-remaining_ccf = 0
-current_date = today
-while current_date <= billing_end_date:
-    date_str = current_date.strftime("%Y-%m-%d")
-    if forecast_data and date_str in forecast_data:
-        fc = forecast_data[date_str]
-        if fc["high"] and fc["low"]:
-            hdd = max(0, 65 - (fc["high"] + fc["low"]) / 2)
-            remaining_hdd += hdd
-            remaining_ccf += hdd * ccf_per_hdd
-    else:
-        remaining_hdd += 25
-        remaining_ccf += 25 * ccf_per_hdd
-    current_date += timedelta(days=1)
-
 # =============================================================================
 # USAGE CALCULATION
 # =============================================================================
@@ -356,41 +575,4 @@ else:
 # BILL ESTIMATE
 # =============================================================================
 
-print("\n" + "=" * 70)
-print("BILL ESTIMATE")
-print("=" * 70)
-
-usage_ccf = total_ccf
-usage_mcf = usage_ccf / 10
-
-# Charges (from actual bills)
-customer_charge = 25.00
-distribution_base = usage_mcf * R
-wna_charge = usage_mcf * wnaf
-prp_charge = usage_mcf * 0.8214
-gas_cost = usage_ccf * 0.54034
-school_fee = usage_ccf * 0.03
-franchise_fee = usage_ccf * 0.01
-
-print(f"\nUsage: {usage_ccf:.0f} CCF ({usage_mcf:.1f} Mcf)")
-print(f"\n{'Charge':<25} {'Amount':>10}")
-print("-" * 40)
-print(f"{'Customer Charge':<25} ${customer_charge:>9.2f}")
-print(f"{'Distribution':<25} ${distribution_base:>9.2f}")
-print(f"{'WNA':<25} ${wna_charge:>9.2f}")
-print(f"{'PRP':<25} ${prp_charge:>9.2f}")
-print(f"{'Gas Cost (GCA)':<25} ${gas_cost:>9.2f}")
-print(f"{'School Fee':<25} ${school_fee:>9.2f}")
-print(f"{'Franchise Fee':<25} ${franchise_fee:>9.2f}")
-print("-" * 40)
-
-total_bill = (customer_charge + distribution_base + wna_charge +
-              prp_charge + gas_cost + school_fee + franchise_fee)
-print(f"{'TOTAL ESTIMATED BILL':<25} ${total_bill:>9.2f}")
-
-# Show effective rates
-print(f"\n{'='*40}")
-print("EFFECTIVE RATES:")
-dist_total = distribution_base + wna_charge
-print(f"  Distribution (w/WNA): ${dist_total/usage_ccf:.5f}/Ccf")
-print(f"  Total variable:       ${(total_bill - customer_charge)/usage_ccf:.5f}/Ccf")
+total_bill = print_bill_estimate(total_ccf, R, wnaf)
@@ -0,0 +1,67 @@
+"""
+Honeywell Total Connect Comfort helpers shared by app.py and thermostat_collector.py
+Saves the logged-in pyhtcc session so a new process can skip the portal
+login, and maps the integer codes Honeywell reports to names
+"""
+
+import os
+import time
+import json
+import requests
+from pyhtcc import PyHTCC
+
+# Saved sessions older than this are ignored and a fresh login is done
+COOKIE_MAX_AGE = 24 * 60 * 60  # seconds
+
+# SystemSwitchPosition / fanMode codes, indexed by the integer Honeywell reports
+MODE_MAP = ('emheat', 'heat', 'off', 'cool', 'auto')
+FAN_MAP = ('auto', 'on', 'circulate')
+
+
+def lookup_code(names, code):
+    """Map a Honeywell integer code to its name, or 'unknown'"""
+    if isinstance(code, int) and 0 <= code < len(names):
+        return names[code]
+    return 'unknown'
+
+
+def save_session(htcc, path):
+    """Persist the Honeywell session cookies so the next process can skip the login"""
+    try:
+        # Plain JSON rather than pickle, so loading the file can never run
+        # code; each cookie keeps its domain and path so it is only sent back
+        # to the Honeywell portal
+        cookies = [
+            {'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+             'secure': c.secure, 'expires': c.expires}
+            for c in htcc.session.cookies
+        ]
+        # Created 0600 since the cookies are a credential
+        fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            json.dump({'cookies': cookies, 'location_id': htcc._locationId}, f)
+    except Exception as e:
+        print(f"  Could not save Honeywell session: {e}")
+
+
+def load_session(path, email, password):
+    """Rebuild a PyHTCC client from saved cookies, or None if missing or stale"""
+    try:
+        if time.time() - os.path.getmtime(path) > COOKIE_MAX_AGE:
+            return None
+        with open(path, encoding='utf-8') as f:
+            saved = json.load(f)
+    except Exception:
+        return None
+
+    # Bypass __init__, which always performs a fresh login
+    htcc = PyHTCC.__new__(PyHTCC)
+    htcc.username = email
+    htcc.password = password
+    htcc._locationId = saved['location_id']
+    htcc.session = requests.session()
+    htcc.session.auth = (email.encode('utf-8'), password.encode('utf-8'))
+    for c in saved['cookies']:
+        htcc.session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'],
+                                 secure=c['secure'], expires=c['expires'])
+    return htcc
@@ -1,12 +1,14 @@
 #!/usr/bin/env python3
 """
-Log a gas meter reading to the database
-Usage: python log_meter.py <reading>
+Log gas meter readings to the database
+Usage: python log_meter.py <reading> [<reading> ...]
 """
 
 import os
 import sys
+import atexit
 import psycopg2
+import psycopg2.extras
 from datetime import datetime
 from dotenv import load_dotenv
 
@@ -15,56 +17,74 @@ load_dotenv()
 DATABASE_URL = os.environ.get('DATABASE_URL')
 
 
+_conn = None
+
+
+def get_connection():
+    """Open the database connection on first use and reuse it for the rest of the run"""
+    global _conn
+    if _conn is None or _conn.closed:
+        _conn = psycopg2.connect(DATABASE_URL)
+        atexit.register(_conn.close)
+    return _conn
+
+
 def get_last_reading():
     """Get the most recent meter reading"""
-    conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
-    cur.execute("SELECT meter_reading FROM gas_meter_readings ORDER BY recorded_at DESC LIMIT 1")
-    result = cur.fetchone()
-    cur.close()
-    conn.close()
+    with get_connection().cursor() as cur:
+        cur.execute("SELECT meter_reading FROM gas_meter_readings ORDER BY recorded_at DESC LIMIT 1")
+        result = cur.fetchone()
     return result[0] if result else None
 
 
-def log_reading(reading):
-    """Log a new meter reading"""
+def log_readings(readings):
+    """Log meter readings (oldest first) with one lookup and one INSERT"""
+    # Each reading's usage is relative to the one before it, so only the
+    # first needs the database's latest reading
     last = get_last_reading()
-    ccf_since_last = reading - last if last else None
+    rows = []
+    for reading in readings:
+        rows.append((reading, reading - last if last else None))
+        last = reading
+
+    conn = get_connection()
+    with conn.cursor() as cur:
+        # clock_timestamp() advances per row, unlike now(), so the batch
+        # keeps its order under ORDER BY recorded_at
+        results = psycopg2.extras.execute_values(cur, """
+            INSERT INTO gas_meter_readings (meter_reading, ccf_since_last, recorded_at)
+            VALUES %s
+            RETURNING id, recorded_at
+        """, rows, template="(%s, %s, clock_timestamp())", page_size=len(rows), fetch=True)
+    conn.commit()
 
-    conn = psycopg2.connect(DATABASE_URL)
-    cur = conn.cursor()
-    cur.execute("""
-        INSERT INTO gas_meter_readings (meter_reading, ccf_since_last)
-        VALUES (%s, %s)
-        RETURNING id, recorded_at
-    """, (reading, ccf_since_last))
+    return [(result, ccf_since_last) for result, (_, ccf_since_last) in zip(results, rows)]
 
-    result = cur.fetchone()
-    conn.commit()
-    cur.close()
-    conn.close()
 
-    return result, ccf_since_last
+def log_reading(reading):
+    """Log a new meter reading"""
+    return log_readings([reading])[0]
 
 
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python log_meter.py <reading>")
+    if len(sys.argv) < 2:
+        print("Usage: python log_meter.py <reading> [<reading> ...]")
         print("Example: python log_meter.py 1410")
         sys.exit(1)
 
     try:
-        reading = int(sys.argv[1])
+        readings = [int(arg) for arg in sys.argv[1:]]
     except ValueError:
         print("Error: Reading must be a number")
         sys.exit(1)
 
-    (record_id, recorded_at), ccf_since_last = log_reading(reading)
+    logged = log_readings(readings)
 
-    print(f"[{datetime.now()}] Logged meter reading: {reading}")
-    if ccf_since_last is not None:
-        print(f"  CCF since last reading: {ccf_since_last}")
-    print(f"  Saved as record #{record_id} at {recorded_at}")
+    for reading, ((record_id, recorded_at), ccf_since_last) in zip(readings, logged):
+        print(f"[{datetime.now()}] Logged meter reading: {reading}")
+        if ccf_since_last is not None:
+            print(f"  CCF since last reading: {ccf_since_last}")
+        print(f"  Saved as record #{record_id} at {recorded_at}")
 
 
 if __name__ == '__main__':
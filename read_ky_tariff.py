@@ -1,57 +1,83 @@
+import re
+import gzip
 import pdfplumber
 
 pdf_path = r"C:\dev\Budget\Atmos\Kentucky Tariff - November 2025.pdf"
-output_path = r"C:\dev\Budget\Atmos\ky_tariff_extracted.txt"
+output_path = r"C:\dev\Budget\Atmos\ky_tariff_extracted.txt.gz"
 
 print(f"Reading: {pdf_path}")
 print("This may take a moment for a large PDF...")
 
-with open(output_path, "w", encoding="utf-8") as out_file:
+# Search for relevant terms
+search_terms = ["WNA", "Weather Normalization", "HSF", "Heat Sensitivity",
+                "Base Load", "BL", "Heating Degree", "HDD", "G-1", "Residential"]
+
+# Lowercase each line once, and use one combined pattern to skip the lines
+# that match no term at all; only the rest are checked term by term
+lowered_terms = [term.lower() for term in search_terms]
+any_term = re.compile("|".join(map(re.escape, lowered_terms)))
+match_counts = {term: 0 for term in search_terms}
+first_matches = {term: [] for term in search_terms}  # [(page, line number, line)]
+line_count = 0
+page_number = 0
+
+# Lines are scanned as they are written, so the extracted text is never
+# held in memory or read back from disk. The dump is mostly repetitive
+# tariff text, so even the fastest gzip level shrinks it several-fold
+# (read it back with gzip.open(output_path, "rt") or zcat)
+with gzip.open(output_path, "wt", encoding="utf-8", compresslevel=1) as out_file:
+    def write(chunk):
+        global line_count
+        out_file.write(chunk)
+        # Every chunk ends with a newline, so it splits into whole lines
+        for line in chunk.split("\n")[:-1]:
+            lowered = line.lower()
+            if any_term.search(lowered):
+                for term, lowered_term in zip(search_terms, lowered_terms):
+                    if lowered_term in lowered:
+                        match_counts[term] += 1
+                        if len(first_matches[term]) < 3:
+                            first_matches[term].append((page_number, line_count, line))
+            line_count += 1
+
     with pdfplumber.open(pdf_path) as pdf:
         total_pages = len(pdf.pages)
         print(f"Total pages: {total_pages}")
 
         for i, page in enumerate(pdf.pages, 1):
+            page_number = i
             if i % 50 == 0:
                 print(f"Processing page {i}/{total_pages}...")
 
-            out_file.write(f"\n--- Page {i} ---\n\n")
+            write(f"\n--- Page {i} ---\n\n")
 
             text = page.extract_text()
             if text:
-                out_file.write(text + "\n")
+                write(text + "\n")
 
             # Extract tables if present
             tables = page.extract_tables()
             if tables:
-                out_file.write(f"\n[Tables found on page {i}]\n")
+                write(f"\n[Tables found on page {i}]\n")
                 for j, table in enumerate(tables, 1):
-                    out_file.write(f"\nTable {j}:\n")
+                    write(f"\nTable {j}:\n")
                     for row in table:
-                        out_file.write(" | ".join(str(cell) if cell else "" for cell in row) + "\n")
+                        write(" | ".join(str(cell) if cell else "" for cell in row) + "\n")
+
+            # Drop the page's parsed layout objects before moving on
+            page.flush_cache()
 
 print(f"\nExtraction complete!")
 print(f"Output saved to: {output_path}")
 print(f"\nNow searching for WNA-related content...")
 
-# Search for relevant terms
-search_terms = ["WNA", "Weather Normalization", "HSF", "Heat Sensitivity",
-                "Base Load", "BL", "Heating Degree", "HDD", "G-1", "Residential"]
-
-with open(output_path, "r", encoding="utf-8") as f:
-    content = f.read()
-    lines = content.split("\n")
-
 print("\n" + "=" * 70)
 print("KEY FINDINGS:")
 print("=" * 70)
 
 for term in search_terms:
-    matches = [i for i, line in enumerate(lines) if term.lower() in line.lower()]
-    if matches:
-        print(f"\n'{term}' found on {len(matches)} lines")
-        # Show first few matches with context
-        for idx in matches[:3]:
-            start = max(0, idx - 1)
-            end = min(len(lines), idx + 2)
-            print(f"  Line {idx}: {lines[idx][:100]}...")
+    if match_counts[term]:
+        print(f"\n'{term}' found on {match_counts[term]} lines")
+        # Show first few matches
+        for page_no, idx, line in first_matches[term]:
+            print(f"  Page {page_no}, line {idx}: {line[:100]}...")
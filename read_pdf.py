@@ -29,5 +29,8 @@ with pdfplumber.open(pdf_path) as pdf:
                 for row in table:
                     print(" | ".join(str(cell) if cell else "" for cell in row))
 
+        # Drop the page's parsed layout objects before moving on
+        page.flush_cache()
+
 print("\n" + "=" * 80)
 print("PDF extraction complete.")
@@ -2,13 +2,19 @@
 """
 Thermostat Data Collector
 Reads data from Honeywell WiFi 9000 and stores in Neon database
+Usage: python thermostat_collector.py [--recompute-adjusted]
 """
 
 import os
+import sys
+import atexit
 import psycopg2
+import psycopg2.extras
 from datetime import datetime
 from dotenv import load_dotenv
 from pyhtcc import PyHTCC
+import htcc_session
+from htcc_session import MODE_MAP, FAN_MAP, lookup_code
 
 # Load environment variables from .env file
 load_dotenv()
@@ -20,42 +26,59 @@ DATABASE_URL = os.environ.get('DATABASE_URL')
 HONEYWELL_EMAIL = os.environ.get('PYHTCC_EMAIL')
 HONEYWELL_PASS = os.environ.get('PYHTCC_PASS')
 
+# Honeywell session cookies saved between runs so most runs skip the login
+HTCC_COOKIE_PATH = os.environ.get(
+    'HTCC_COOKIE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.htcc.cookies'))
+
 # Downstairs setpoint (for adjusted outdoor temp calculation)
 DOWNSTAIRS_SETPOINT = 65
 HEAT_RISE_FACTOR = 0.3  # Calibrate based on actual data
 
+# thermostat_readings columns written per reading (recorded_at defaults to now())
+READING_COLUMNS = (
+    'indoor_temp', 'outdoor_temp', 'adjusted_outdoor_temp', 'heat_setpoint', 'cool_setpoint',
+    'humidity', 'mode', 'fan_mode', 'is_heating', 'is_cooling',
+)
+
 
 def get_thermostat_data():
-    """Fetch current thermostat data from Honeywell"""
-    htcc = PyHTCC(HONEYWELL_EMAIL, HONEYWELL_PASS)
-    zones = htcc.get_all_zones()
+    """Fetch current thermostat data from Honeywell, one reading per zone"""
+    zones = []
+    htcc = htcc_session.load_session(HTCC_COOKIE_PATH, HONEYWELL_EMAIL, HONEYWELL_PASS)
+    if htcc is not None:
+        try:
+            zones = htcc.get_all_zones()
+        except Exception as e:
+            print(f"  Saved Honeywell session rejected ({e}), logging in again")
+
+    if not zones:
+        htcc = PyHTCC(HONEYWELL_EMAIL, HONEYWELL_PASS)
+        zones = htcc.get_all_zones()
 
     if not zones:
         raise Exception("No zones found")
 
-    zone = zones[0]  # Use first zone
+    htcc_session.save_session(htcc, HTCC_COOKIE_PATH)
+    return [zone_reading(zone) for zone in zones]
+
+
+def zone_reading(zone):
+    """Build a thermostat_readings row from one zone's latest data"""
     info = zone.zone_info
     ui_data = info.get('latestData', {}).get('uiData', {})
     fan_data = info.get('latestData', {}).get('fanData', {})
 
-    # Map SystemSwitchPosition to mode string
-    mode_map = {0: 'emheat', 1: 'heat', 2: 'off', 3: 'cool', 4: 'auto'}
-    fan_map = {0: 'auto', 1: 'on', 2: 'circulate'}
-
     # EquipmentOutputStatus: 0=off, 1=heating, 2=cooling
     equip_status = ui_data.get('EquipmentOutputStatus', 0)
 
     outdoor_temp = info.get('OutdoorTemperature') if info.get('OutdoorTemperature') != 128 else None
 
     # Calculate adjusted outdoor temp (accounts for heat rising from downstairs)
+    # Below the setpoint downstairs is heating and some heat rises upstairs;
+    # at or above it the max() term is 0 and there is no adjustment
     adjusted_outdoor = None
     if outdoor_temp is not None:
-        if outdoor_temp < DOWNSTAIRS_SETPOINT:
-            # Downstairs is heating, some heat rises to upstairs
-            adjusted_outdoor = outdoor_temp + (HEAT_RISE_FACTOR * (DOWNSTAIRS_SETPOINT - outdoor_temp))
-        else:
-            # No heating needed downstairs, no adjustment
-            adjusted_outdoor = outdoor_temp
+        adjusted_outdoor = outdoor_temp + HEAT_RISE_FACTOR * max(0, DOWNSTAIRS_SETPOINT - outdoor_temp)
 
     return {
         'indoor_temp': info.get('DispTemp'),
@@ -64,54 +87,79 @@ def get_thermostat_data():
         'heat_setpoint': ui_data.get('HeatSetpoint'),
         'cool_setpoint': ui_data.get('CoolSetpoint'),
         'humidity': info.get('IndoorHumi'),
-        'mode': mode_map.get(ui_data.get('SystemSwitchPosition'), 'unknown'),
-        'fan_mode': fan_map.get(fan_data.get('fanMode'), 'unknown'),
+        'mode': lookup_code(MODE_MAP, ui_data.get('SystemSwitchPosition')),
+        'fan_mode': lookup_code(FAN_MAP, fan_data.get('fanMode')),
         'is_heating': equip_status == 1,
         'is_cooling': equip_status == 2,
     }
 
 
-def save_to_db(data):
-    """Save thermostat reading to Neon database"""
-    conn = psycopg2.connect(DATABASE_URL)
+_conn = None
+
+
+def get_connection():
+    """Open the database connection on first use and reuse it across saves"""
+    global _conn
+    if _conn is None or _conn.closed:
+        # Keepalives stop Neon/NAT from silently dropping the connection
+        # between saves when the collector runs as a long-lived process
+        _conn = psycopg2.connect(DATABASE_URL, keepalives=1, keepalives_idle=30)
+        atexit.register(_conn.close)
+    return _conn
+
+
+def save_to_db(readings):
+    """Save thermostat readings to Neon database in one round trip"""
+    conn = get_connection()
     cur = conn.cursor()
 
-    cur.execute("""
+    result = psycopg2.extras.execute_values(cur, """
         INSERT INTO thermostat_readings
         (indoor_temp, outdoor_temp, adjusted_outdoor_temp, heat_setpoint, cool_setpoint,
          humidity, mode, fan_mode, is_heating, is_cooling)
-        VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+        VALUES %s
         RETURNING id, recorded_at
-    """, (
-        data['indoor_temp'],
-        data['outdoor_temp'],
-        data['adjusted_outdoor_temp'],
-        data['heat_setpoint'],
-        data['cool_setpoint'],
-        data['humidity'],
-        data['mode'],
-        data['fan_mode'],
-        data['is_heating'],
-        data['is_cooling'],
-    ))
-
-    result = cur.fetchone()
+    """, [tuple(data[col] for col in READING_COLUMNS) for data in readings], fetch=True)
+
     conn.commit()
     cur.close()
-    conn.close()
 
     return result
 
 
+def recompute_adjusted_temps():
+    """Re-derive adjusted_outdoor_temp for every stored reading, in place"""
+    # Computed by Postgres so no rows cross the network; same formula again
+    conn = get_connection()
+    cur = conn.cursor()
+    cur.execute("""
+        UPDATE thermostat_readings
+        SET adjusted_outdoor_temp = outdoor_temp + %s * GREATEST(0, %s - outdoor_temp)
+        WHERE outdoor_temp IS NOT NULL
+    """, (HEAT_RISE_FACTOR, DOWNSTAIRS_SETPOINT))
+    updated = cur.rowcount
+    conn.commit()
+    cur.close()
+
+    return updated
+
+
 def main():
+    if '--recompute-adjusted' in sys.argv[1:]:
+        # Run after recalibrating HEAT_RISE_FACTOR or DOWNSTAIRS_SETPOINT
+        updated = recompute_adjusted_temps()
+        print(f"[{datetime.now()}] Recomputed adjusted outdoor temp for {updated} readings")
+        return
+
     print(f"[{datetime.now()}] Fetching thermostat data...")
 
     try:
-        data = get_thermostat_data()
-        print(f"  Indoor: {data['indoor_temp']}F, Outdoor: {data['outdoor_temp']}F (adj: {data['adjusted_outdoor_temp']:.1f}F), Setpoint: {data['heat_setpoint']}F, Heating: {data['is_heating']}")
+        readings = get_thermostat_data()
+        for data in readings:
+            print(f"  Indoor: {data['indoor_temp']}F, Outdoor: {data['outdoor_temp']}F (adj: {data['adjusted_outdoor_temp']:.1f}F), Setpoint: {data['heat_setpoint']}F, Heating: {data['is_heating']}")
 
-        record_id, recorded_at = save_to_db(data)
-        print(f"  Saved as record #{record_id} at {recorded_at}")
+        for record_id, recorded_at in save_to_db(readings):
+            print(f"  Saved as record #{record_id} at {recorded_at}")
 
     except Exception as e:
         print(f"  Error: {e}")